@@ -1,47 +1,23 @@
 import os
 import sys
+import argparse
+import asyncio
+import hashlib
+import json
 import subprocess
-import shutil
-import datetime
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from importlib.metadata import distribution, PackageNotFoundError
 
 # Configuration
 APP_NAME = "MOVUtil"
 AUTHOR = "Gen."
 VERSION = "1.0.0"
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "movutil-build")
 
-# Ensure PyInstaller is installed
-try:
-    import PyInstaller
-except ImportError:
-    print("Installing PyInstaller...")
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "pyinstaller"])
-
-# Ensure MSIX Packaging Tool SDK is available
-try:
-    import win32api
-except ImportError:
-    print("Installing pywin32...")
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "pywin32"])
-
-# Create build directory
-build_dir = os.path.join(BASE_DIR, "build")
-dist_dir = os.path.join(BASE_DIR, "dist")
-msix_dir = os.path.join(BASE_DIR, "msix")
-
-for directory in [build_dir, dist_dir, msix_dir]:
-    if os.path.exists(directory):
-        shutil.rmtree(directory)
-    os.makedirs(directory)
-
-# Create app manifest for Microsoft Store
-def create_appx_manifest():
-    manifest_path = os.path.join(msix_dir, "AppxManifest.xml")
-    
-    # Get current date in the format YYYY-MM-DD
-    current_date = datetime.datetime.now().strftime("%Y-%m-%d")
-    
-    manifest_content = f'''
+# App manifest for Microsoft Store, formatted once at import
+MANIFEST_TEMPLATE = '''
 <?xml version="1.0" encoding="utf-8"?>
 <Package
   xmlns="http://schemas.microsoft.com/appx/manifest/foundation/windows10"
@@ -78,11 +54,113 @@ def create_appx_manifest():
   </Capabilities>
 </Package>
 '''
+MANIFEST_BYTES = MANIFEST_TEMPLATE.format(
+    APP_NAME=APP_NAME, AUTHOR=AUTHOR, VERSION=VERSION
+).encode("utf-8")
+
+# Valid 1x1 transparent PNG used as a placeholder logo
+PLACEHOLDER_PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d49484452000000010000000108060000001f15c489"
+    "0000000b4944415478da636000020000050001e9fadcd80000000049454e44ae426082"
+)
+
+# Ensure packages are installed, checking the installed-package metadata
+# rather than importing them. Missing packages are installed with a single
+# pip run. Returns the installed versions keyed by package name.
+def ensure_packages(*names):
+    missing = []
+    for name in names:
+        try:
+            distribution(name)
+        except PackageNotFoundError:
+            missing.append(name)
     
-    with open(manifest_path, "w", encoding="utf-8") as f:
-        f.write(manifest_content)
+    if missing:
+        print(f"Installing {', '.join(missing)}...")
+        subprocess.check_call([sys.executable, "-m", "pip", "install", "--no-input",
+                               "--disable-pip-version-check", "-q", *missing])
     
-    print(f"Created AppxManifest.xml at {manifest_path}")
+    return {name: distribution(name).version for name in names}
+
+# Build directories
+build_dir = os.path.join(BASE_DIR, "build")
+dist_dir = os.path.join(BASE_DIR, "dist")
+msix_dir = os.path.join(BASE_DIR, "msix")
+work_cache_dir = os.path.join(CACHE_DIR, "work")
+
+# Third-party packages bundled with the app; their versions key the analysis cache
+BUNDLED_PACKAGES = ["PyQt5", "opencv-python", "numpy", "pillow", "tifffile"]
+
+# Number of built bundles kept in the build cache, most recently used first
+BUNDLE_CACHE_KEEP = 3
+
+# Remove all build artifacts, including the build cache, so the next build
+# starts from scratch
+def full_clean():
+    import shutil
+    
+    # The directories are disjoint, so remove them concurrently
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(lambda d: shutil.rmtree(d, ignore_errors=True),
+                          [build_dir, dist_dir, msix_dir, CACHE_DIR]))
+    print("Removed previous build artifacts")
+
+# Drop cache entries in directory beyond the BUNDLE_CACHE_KEEP most recently used ones
+def prune_cache_dir(directory, exclude=None):
+    import shutil
+    
+    try:
+        entries = [entry for entry in os.scandir(directory)
+                   if entry.is_dir() and entry.path != exclude]
+    except OSError:
+        return
+    entries.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    for entry in entries[BUNDLE_CACHE_KEEP:]:
+        shutil.rmtree(entry.path, ignore_errors=True)
+
+# Drop cached bundles and PyInstaller work directories that are no longer in use
+def prune_bundle_cache():
+    prune_cache_dir(CACHE_DIR, exclude=work_cache_dir)
+    prune_cache_dir(work_cache_dir)
+
+# Create the build directories without touching existing artifacts
+def prepare_dirs():
+    for directory in [build_dir, dist_dir, msix_dir]:
+        os.makedirs(directory, exist_ok=True)
+
+# Generated files are queued here and written together at the end of the build
+pending_writes = []
+
+# Write a generated file, skipping the write when the content is unchanged
+def write_if_changed(path, data):
+    try:
+        if Path(path).read_bytes() == data:
+            return False
+    except OSError:
+        pass
+    
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+    return True
+
+# Write all queued files in one pass, without fsync
+def flush_pending_writes():
+    while pending_writes:
+        path, data, label = pending_writes.pop(0)
+        if write_if_changed(path, data):
+            print(f"Created {label} at {path}")
+        else:
+            print(f"{label} is up to date at {path}")
+
+# Create app manifest for Microsoft Store
+def create_appx_manifest():
+    manifest_path = os.path.join(msix_dir, "AppxManifest.xml")
+    pending_writes.append((manifest_path, MANIFEST_BYTES, "AppxManifest.xml"))
     return manifest_path
 
 # Create assets directory and placeholder logo
@@ -91,39 +169,219 @@ def create_assets():
     os.makedirs(assets_dir, exist_ok=True)
     
     # Create a simple placeholder logo (you should replace this with your actual logo)
+    logo_path = Path(assets_dir, "logo.png")
+    if logo_path.exists():
+        return
+    logo_path.write_bytes(PLACEHOLDER_PNG)
     print("Note: You should replace the placeholder logo with your actual logo.")
     print(f"Placeholder logo created at {assets_dir}\\logo.png")
 
-# Build the application using PyInstaller with optimized settings
-def build_app():
+# Copy a file letting the OS move the data instead of copying through Python
+def fast_copy(src, dst):
+    if os.path.isdir(dst):
+        dst = os.path.join(dst, os.path.basename(src))
+    
+    if sys.platform == "win32":
+        import win32file  # installed by ensure_packages() in build_app()
+        win32file.CopyFile(src, dst, False)
+        return dst
+    
+    if hasattr(os, "copy_file_range"):
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                remaining = os.fstat(fsrc.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+            if remaining == 0:
+                return dst
+        except OSError:
+            pass
+    
+    import shutil
+    shutil.copyfile(src, dst)
+    return dst
+
+# Hard-link a file (no data copied), falling back to a copy across filesystems
+def link_or_copy(src, dst):
+    if os.path.isdir(dst):
+        dst = os.path.join(dst, os.path.basename(src))
+    
+    if os.path.lexists(dst):
+        if os.path.exists(dst) and os.path.samefile(src, dst):
+            return dst
+        os.remove(dst)
+    
+    try:
+        os.link(src, dst)
+    except OSError:
+        return fast_copy(src, dst)
+    return dst
+
+# Files in the MSIX directory that are not part of the PyInstaller bundle
+MSIX_OWN_FILES = {"assets", "AppxManifest.xml"}
+
+# Stage a PyInstaller bundle directory, first removing the previous bundle's
+# files (except those named in keep) so files dropped from the bundle do not linger
+def copy_bundle(src_dir, dst_dir, keep=()):
+    import shutil
+    if os.path.isdir(dst_dir):
+        for entry in os.scandir(dst_dir):
+            if entry.name in keep:
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                shutil.rmtree(entry.path)
+            else:
+                os.remove(entry.path)
+    shutil.copytree(src_dir, dst_dir, copy_function=link_or_copy, dirs_exist_ok=True)
+
+# Installed versions of the bundled packages ("" when missing)
+def bundled_versions():
+    versions = {}
+    for name in BUNDLED_PACKAGES:
+        try:
+            versions[name] = distribution(name).version
+        except PackageNotFoundError:
+            versions[name] = ""
+    return versions
+
+# Hash the inputs PyInstaller depends on, used to detect unchanged rebuilds.
+# This script is included because it holds the PyInstaller command line.
+def build_stamp_key(pyinstaller_version):
+    digest = hashlib.sha256()
+    for path in [os.path.join(BASE_DIR, "video_player.py"),
+                 os.path.join(BASE_DIR, "README.md"),
+                 os.path.join(msix_dir, "assets", "logo.png"),
+                 os.path.abspath(__file__)]:
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                digest.update(f.read())
+        digest.update(b"\0")
+    
+    digest.update(sys.version.encode("utf-8"))
+    digest.update(pyinstaller_version.encode("utf-8"))
+    for name, version in bundled_versions().items():
+        digest.update(f"{name}=={version}\0".encode("utf-8"))
+    digest.update(MANIFEST_BYTES)
+    return digest.hexdigest()
+
+# Key PyInstaller's work directory by the bundled dependency versions, so the
+# expensive analysis of the Qt/OpenCV/NumPy trees is done once per version set
+# and survives rebuilds of the app itself
+def prepack_key(pyinstaller_version):
+    digest = hashlib.sha256()
+    digest.update(sys.version.encode("utf-8"))
+    digest.update(pyinstaller_version.encode("utf-8"))
+    for name, version in bundled_versions().items():
+        digest.update(f"{name}=={version}\0".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+def read_build_stamp():
+    stamp_path = os.path.join(build_dir, ".build_stamp")
+    try:
+        with open(stamp_path, "r", encoding="utf-8") as f:
+            return json.load(f).get("key")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def write_build_stamp(key):
+    stamp_path = os.path.join(build_dir, ".build_stamp")
+    with open(stamp_path, "w", encoding="utf-8") as f:
+        json.dump({"key": key}, f)
+
+# Build the application using PyInstaller with optimized settings.
+# Returns True when the executable was reused instead of rebuilt.
+async def build_app(use_cache=True):
+    # pywin32 provides the Windows fast_copy() path
+    required = ["pyinstaller"]
+    if sys.platform == "win32":
+        required.append("pywin32")
+    pyinstaller_version = ensure_packages(*required)["pyinstaller"]
+    bundle_dir = os.path.join(dist_dir, APP_NAME)
+    exe_path = os.path.join(bundle_dir, f"{APP_NAME}.exe")
+    key = build_stamp_key(pyinstaller_version)
+    cached_bundle = os.path.join(CACHE_DIR, key, APP_NAME)
+    
+    # Skip PyInstaller entirely when none of its inputs changed
+    if use_cache and os.path.exists(exe_path) and read_build_stamp() == key:
+        print("Build inputs unchanged, skipping PyInstaller")
+        copy_bundle(bundle_dir, msix_dir, keep=MSIX_OWN_FILES)
+        return True
+    
+    if use_cache and os.path.exists(os.path.join(cached_bundle, f"{APP_NAME}.exe")):
+        print(f"Using cached build from {cached_bundle}")
+        # Mark the entry as recently used for prune_bundle_cache()
+        os.utime(os.path.dirname(cached_bundle))
+        copy_bundle(cached_bundle, bundle_dir)
+        write_build_stamp(key)
+        copy_bundle(cached_bundle, msix_dir, keep=MSIX_OWN_FILES)
+        return True
+    
     print("Building application with PyInstaller...")
     
+    # Mark the work directory as recently used for prune_bundle_cache()
+    work_dir = os.path.join(work_cache_dir, prepack_key(pyinstaller_version))
+    os.makedirs(work_dir, exist_ok=True)
+    os.utime(work_dir)
+    
     # PyInstaller command with optimization flags
     pyinstaller_cmd = [
         "pyinstaller",
         "--name=" + APP_NAME,
-        "--onefile",  # Create a single executable
+        # --onedir instead of --onefile: no LZMA pass at build time and no
+        # extraction to a temp directory on every launch; MSIX compresses the package
+        "--onedir",
         "--windowed",  # Don't show console window
-        "--clean",     # Clean PyInstaller cache
+        # No --clean: reuse PyInstaller's analysis cache (use --fresh for a fresh build)
         "--noconfirm", # Replace output directory without asking
+        # Reuse the dependency analysis cached for this set of package versions
+        "--workpath=" + work_dir,
         "--add-data=README.md;.",  # Include README
         "--icon=msix/assets/logo.png",  # Use the app icon
         # Performance optimizations
-        "--noupx",     # Disable UPX compression for faster startup
-        "--key=MOVUtilKey",  # Encryption key for bytecode obfuscation
-        # Additional optimization flags
-        "--strip",     # Strip symbols from executable (smaller size)
-        "video_player.py"  # Main script
+        # Disable UPX compression for faster startup (only matters where UPX is installed)
+        "--noupx",
+        # No --key: bytecode encryption adds an AES pass to every build and
+        # a decrypt on every import at launch
     ]
     
-    # Run PyInstaller
-    subprocess.run(pyinstaller_cmd, check=True)
+    # Strip symbols from executable (smaller size); on Windows this only
+    # spawns strip.exe per binary for little or no gain
+    if sys.platform != "win32":
+        pyinstaller_cmd.append("--strip")
+    
+    pyinstaller_cmd.append("video_player.py")  # Main script
+    
+    # Let PyInstaller's Python write bytecode caches even if the caller disabled them
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    
+    # Run PyInstaller, streaming its log as it goes
+    proc = await asyncio.create_subprocess_exec(
+        *pyinstaller_cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,
+        env=env
+    )
+    async for line in proc.stdout:
+        print(line.decode(errors="replace"), end="")
+    returncode = await proc.wait()
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, pyinstaller_cmd)
+    write_build_stamp(key)
     
-    # Copy the executable to the MSIX directory
-    exe_path = os.path.join(dist_dir, f"{APP_NAME}.exe")
-    shutil.copy(exe_path, msix_dir)
+    # Keep a copy in the build cache for later builds with the same inputs
+    if use_cache:
+        copy_bundle(bundle_dir, cached_bundle)
+    prune_bundle_cache()
+    
+    # Stage the bundle's loose files in the MSIX directory
+    copy_bundle(bundle_dir, msix_dir, keep=MSIX_OWN_FILES)
     
     print(f"Application built successfully at {msix_dir}\\{APP_NAME}.exe")
+    return False
 
 # Create a batch file to help with MSIX packaging
 def create_packaging_batch():
@@ -146,32 +404,42 @@ pause > nul
 start "" "%~dp0msix"
 '''
     
-    with open(batch_path, "w") as f:
-        f.write(batch_content)
-    
-    print(f"Created packaging helper batch file at {batch_path}")
+    pending_writes.append((batch_path, batch_content.replace("\n", os.linesep).encode(),
+                           "package_msix.bat"))
 
 # Main build process
-def main():
+async def main():
+    parser = argparse.ArgumentParser(description=f"Build {APP_NAME} for Microsoft Store")
+    parser.add_argument("--fresh", "--force", dest="fresh", action="store_true",
+                        help="remove previous build artifacts and rebuild from scratch")
+    parser.add_argument("--no-cache", dest="use_cache", action="store_false",
+                        help="always run PyInstaller instead of reusing a cached build")
+    args = parser.parse_args()
+    
     print(f"Building {APP_NAME} v{VERSION} by {AUTHOR} for Microsoft Store...")
     
-    # Create assets directory and placeholder logo
+    # Only wipe previous artifacts when explicitly requested
+    if args.fresh:
+        full_clean()
+    prepare_dirs()
+    
+    # Create assets directory and placeholder logo (the icon is needed by PyInstaller)
     create_assets()
     
-    # Create app manifest
+    # Queue the manifest and packaging helper, then build the application
     create_appx_manifest()
-    
-    # Build the application
-    build_app()
-    
-    # Create packaging helper
     create_packaging_batch()
+    cache_hit = await build_app(args.use_cache and not args.fresh)
+    
+    # Write the generated text files together
+    flush_pending_writes()
     
     print("\nBuild completed successfully!")
+    print(f"Build cache: {'hit' if cache_hit else 'miss'}")
     print("To create the MSIX package for Microsoft Store submission:")
     print("1. Run the 'package_msix.bat' script")
     print("2. Follow the instructions to use the MSIX Packaging Tool")
     print("\nNote: You will need a code signing certificate to submit to the Microsoft Store.")
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
@@ -8,30 +8,158 @@ from PyQt5.QtWidgets import (QApplication, QMainWindow, QLabel, QVBoxLayout,
                             QGridLayout, QCheckBox, QMessageBox, QAction,
                             QDialog, QListWidget, QRadioButton, QButtonGroup)
 from PyQt5.QtGui import QImage, QPixmap, QIcon, QDragEnterEvent, QDropEvent
-from PyQt5.QtCore import Qt, QTimer, QThread, pyqtSignal, QMutex, QUrl
+from PyQt5.QtCore import (Qt, QTimer, QThread, QObject, pyqtSignal, pyqtSlot, QUrl,
+                          QSize, QElapsedTimer)
+from PyQt5 import sip
 import threading
-import queue
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image
 import tifffile
 from typing import List, Dict, Union, Optional, Tuple
 
+def aligned_frame_buffer(shape) -> np.ndarray:
+    """Empty uint8 image whose rows each start on a 64-byte boundary"""
+    # Padding the row stride keeps SIMD loads in OpenCV and Qt aligned for
+    # widths whose row size is not a multiple of 64 bytes
+    height, width = shape[:2]
+    channels = shape[2] if len(shape) > 2 else 1
+    stride = (width * channels + 63) // 64 * 64
+    raw = np.empty(height * stride + 64, dtype=np.uint8)
+    offset = -raw.ctypes.data % 64
+    return np.ndarray(shape, np.uint8, raw, offset, (stride,) + (channels, 1)[3 - len(shape):])
+
+class RingBuffer:
+    """Lock-free single-producer/single-consumer ring of preallocated frame slots"""
+    # head and tail are plain ints each written by one side only, so no mutex
+    # is needed. One slot is kept free so the frame most recently returned by
+    # pop() stays valid until the next pop().
+    
+    def __init__(self, capacity: int):
+        # Round up to a power of two so slot positions are a bit mask
+        size = 2
+        while size < capacity + 1:
+            size <<= 1
+        self.size = size
+        self.mask = size - 1
+        self.frames: List[Optional[np.ndarray]] = [None] * size
+        self.indices = np.empty(size, np.int64)
+        self.head = 0  # Next slot to read, written by the consumer only
+        self.tail = 0  # Next slot to write, written by the producer only
+        self.held: Optional[int] = None  # Position of the slot last returned by pop()
+        self.not_full = threading.Event()
+        self.not_full.set()
+    
+    def is_empty(self) -> bool:
+        return self.head == self.tail
+    
+    def is_full(self) -> bool:
+        return self.tail - self.head >= self.size - 1
+    
+    def wait_for_space(self, is_stopped) -> bool:
+        """Block the producer until a slot is free; False if stopped meanwhile"""
+        while self.is_full():
+            self.not_full.clear()
+            # Re-check after clearing so a pop() in between is not missed
+            if not self.is_full():
+                break
+            if is_stopped():
+                return False
+            self.not_full.wait(0.05)
+        return not is_stopped()
+    
+    def acquire(self, shape, dtype) -> np.ndarray:
+        """Return the next writable slot, (re)allocating it for the frame format"""
+        pos = self.tail & self.mask
+        slot = self.frames[pos]
+        if slot is None or slot.shape != shape or slot.dtype != dtype:
+            slot = aligned_frame_buffer(shape) if dtype == np.uint8 else np.empty(shape, dtype)
+            self.frames[pos] = slot
+        return slot
+    
+    def put(self, frame: np.ndarray, frame_index: int):
+        """Publish an already allocated frame without copying it"""
+        self.frames[self.tail & self.mask] = frame
+        self.commit(frame_index)
+    
+    def commit(self, frame_index: int):
+        self.indices[self.tail & self.mask] = frame_index
+        self.tail += 1
+    
+    def pop(self) -> Tuple[Optional[np.ndarray], int]:
+        if self.head == self.tail:
+            return None, -1
+        pos = self.head & self.mask
+        frame, frame_index = self.frames[pos], int(self.indices[pos])
+        self.held = pos
+        self.head += 1
+        self.not_full.set()
+        return frame, frame_index
+    
+    def peek_index(self) -> int:
+        """Index of the oldest unread frame, or -1 if the ring is empty"""
+        head = self.head
+        if head == self.tail:
+            return -1
+        return int(self.indices[head & self.mask])
+    
+    def clear(self):
+        """Drop all published frames (consumer side)"""
+        tail = self.tail
+        # The producer never writes the slot just behind head. Move the buffer
+        # last returned by pop() there, so it stays valid until the next pop()
+        behind = (tail - 1) & self.mask
+        if self.held is not None and self.held != behind:
+            frames = self.frames
+            frames[self.held], frames[behind] = frames[behind], frames[self.held]
+            self.held = behind
+        self.head = tail
+        self.not_full.set()
+    
+    def wake(self):
+        # Release a producer blocked in wait_for_space()
+        self.not_full.set()
+
 class VideoLoaderThread(QThread):
     frame_loaded = pyqtSignal(np.ndarray, int)
+    frame_ready = pyqtSignal(int)  # index of the frame just added to the ring buffer
+    first_frame_ready = pyqtSignal(int)  # first frame after starting or seeking
     loading_finished = pyqtSignal(int, int)  # total_frames, fps
     error_occurred = pyqtSignal(str)
     
+    # Number of compressed TIFF pages decoded ahead of the consumer
+    TIFF_READ_AHEAD = 4
+    # Upper bound on video frames skipped at once when the display falls behind
+    MAX_FRAME_SKIP = 30
+    
     def __init__(self, file_path: str, buffer_size: int = 30, start_frame: int = 0):
         super().__init__()
         self.file_path = file_path
         self.buffer_size = buffer_size
         self.stopped = False
-        self.mutex = QMutex()
-        self.frame_queue = queue.Queue(maxsize=buffer_size)
+        self.ring = RingBuffer(buffer_size)
         self.total_frames = 0
         self.fps = 30  # Default FPS
         self.current_frame_index = start_frame
+        # Frame to jump to, set by seek() and picked up by the loading loop
+        self.seek_request: Optional[int] = None
+        self._first_frame_pending = True
+        # Latest frame of the sync master; only repositions when not already buffered
+        self.sync_target: Optional[int] = None
+        # Written by the GUI thread: frames per second it presents while playing
+        # (None when paused), when it last displayed a frame and the time between
+        # its last two frames (both None right after a seek, so the requested
+        # frame is never skipped)
+        self.display_rate: Optional[float] = None
+        self.last_display_ts: Optional[float] = None
+        self.display_interval: Optional[float] = None
         self.file_extension = os.path.splitext(file_path)[1].lower()
+        # Channel order of 3-channel frames: OpenCV decodes BGR, TIFF pages are RGB
+        if self.file_extension in ['.tif', '.tiff']:
+            self.qimage_format = QImage.Format_RGB888
+        else:
+            self.qimage_format = QImage.Format_BGR888
         
     def run(self):
         try:
@@ -42,8 +170,20 @@ class VideoLoaderThread(QThread):
         except Exception as e:
             self.error_occurred.emit(f"Error loading file: {str(e)}")
     
+    def _open_capture(self) -> cv2.VideoCapture:
+        """Open the video with hardware decoding when the backend supports it"""
+        hw_accel = getattr(cv2, 'CAP_PROP_HW_ACCELERATION', None)
+        if hw_accel is not None:
+            cap = cv2.VideoCapture(self.file_path, cv2.CAP_ANY,
+                                   [hw_accel, cv2.VIDEO_ACCELERATION_ANY])
+            if cap.isOpened():
+                return cap
+            cap.release()
+        # Fall back to software decoding
+        return cv2.VideoCapture(self.file_path)
+    
     def _load_video(self):
-        cap = cv2.VideoCapture(self.file_path)
+        cap = self._open_capture()
         if not cap.isOpened():
             self.error_occurred.emit(f"Could not open video file: {self.file_path}")
             return
@@ -60,74 +200,315 @@ class VideoLoaderThread(QThread):
         # Always emit loading_finished to update total frames and FPS
         self.loading_finished.emit(self.total_frames, int(self.fps))
         
+        # Frame shape, known once the first frame has been decoded
+        frame_shape = None
+        
         while not self.stopped:
-            ret, frame = cap.read()
-            if not ret:
+            # Reposition in place when a seek was requested
+            self._apply_sync_target()
+            request = self.seek_request
+            if request is not None:
+                self.seek_request = None
+                self._first_frame_pending = True
+                cap.set(cv2.CAP_PROP_POS_FRAMES, request)
+                self.current_frame_index = request
+                
+            if not cap.grab():
                 # Reached the end, loop back to the beginning
                 cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
                 self.current_frame_index = 0
                 continue
                 
-            # Convert BGR to RGB
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            
             # Wait if the buffer is full
-            while not self.stopped and self.frame_queue.full():
-                time.sleep(0.01)
+            if not self.ring.wait_for_space(self._should_yield):
+                if self.stopped:
+                    break
+                continue
+            
+            # When the display has fallen behind, skip frames without decoding
+            # them and only decode the frame that will actually be shown
+            for _ in range(self._frames_to_skip()):
+                if not cap.grab():
+                    break
+                self.current_frame_index += 1
                 
-            if not self.stopped:
-                # Put the frame in the queue with its actual frame index
-                self.frame_queue.put((frame, self.current_frame_index))
-                self.current_frame_index = (self.current_frame_index + 1) % self.total_frames
+            # Decode straight into the ring slot, keeping OpenCV's BGR order
+            # (displayed as Format_BGR888, so no color conversion pass)
+            slot = self.ring.acquire(frame_shape, np.uint8) if frame_shape else None
+            ret, frame = cap.retrieve(slot)
+            if not ret:
+                continue
+            
+            # Publish the frame with its actual frame index
+            if frame is slot:
+                self.ring.commit(self.current_frame_index)
+            else:
+                # First frame (or a size change): adopt OpenCV's buffer as the slot
+                frame_shape = frame.shape
+                self.ring.put(frame, self.current_frame_index)
+            self._frame_published(self.current_frame_index)
+            self.current_frame_index = (self.current_frame_index + 1) % self.total_frames
                 
         cap.release()
     
     def _load_tiff(self):
+        tiff = None
+        executor = None
         try:
             # Open the TIFF file
             tiff = tifffile.TiffFile(self.file_path)
             self.total_frames = len(tiff.pages)
             self.loading_finished.emit(self.total_frames, self.fps)
             
-            # Load frames in a separate thread to avoid blocking
-            def load_frames():
-                i = self.current_frame_index
-                while not self.stopped:
+            # Contiguous uncompressed files are memory-mapped, so reading a page
+            # is just a view; anything else is decoded by read-ahead workers
+            mapped_pages = self._memmap_tiff_pages(tiff)
+            if mapped_pages is None:
+                # Page decoding releases the GIL, so workers run in parallel
+                tiff.filehandle.lock = True
+                executor = ThreadPoolExecutor(max_workers=self.TIFF_READ_AHEAD)
+            
+            pending = deque()
+            next_page = self.current_frame_index
+            while not self.stopped:
+                # Restart reading at the requested page when a seek was requested
+                self._apply_sync_target()
+                request = self.seek_request
+                if request is not None:
+                    self.seek_request = None
+                    self._first_frame_pending = True
+                    for _, future in pending:
+                        future.cancel()
+                    pending.clear()
+                    next_page = request
+                
+                # Keep the next pages in flight ahead of the consumer
+                if executor is not None:
+                    while len(pending) < self.TIFF_READ_AHEAD:
+                        # Parsing the page header seeks the shared file handle
+                        with tiff.filehandle.lock:
+                            page = tiff.pages[next_page]
+                        pending.append((next_page, executor.submit(page.asarray)))
+                        next_page = (next_page + 1) % self.total_frames
+                    i, future = pending.popleft()
+                    frame = future.result()
+                else:
+                    i = next_page
+                    frame = mapped_pages[i]
+                    next_page = (next_page + 1) % self.total_frames
+                
+                # Wait if the buffer is full
+                if not self.ring.wait_for_space(self._should_yield):
                     if self.stopped:
                         break
-                        
-                    # Read the frame
-                    frame = tiff.pages[i].asarray()
-                    
-                    # Convert to RGB if needed
-                    if len(frame.shape) == 2:  # Grayscale
-                        frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2RGB)
-                    elif frame.shape[2] == 4:  # RGBA
-                        frame = cv2.cvtColor(frame, cv2.COLOR_RGBA2RGB)
+                    continue
                     
-                    # Wait if the buffer is full
-                    while not self.stopped and self.frame_queue.full():
-                        time.sleep(0.01)
-                        
-                    if not self.stopped:
-                        self.frame_queue.put((frame, i))
-                        i = (i + 1) % self.total_frames
-                        
-            # Start loading frames in a separate thread
-            threading.Thread(target=load_frames, daemon=True).start()
+                self.ring.put(frame, i)
+                self._frame_published(i)
             
         except Exception as e:
             self.error_occurred.emit(f"Error loading TIFF file: {str(e)}")
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+            if tiff is not None:
+                tiff.close()
+    
+    def _memmap_tiff_pages(self, tiff: tifffile.TiffFile) -> Optional[np.ndarray]:
+        """Memory-map all pages as one (pages, ...) array, or None if not possible"""
+        try:
+            pages = tifffile.memmap(self.file_path, mode='r')
+        except Exception:
+            # Compressed, tiled or non-contiguous data cannot be mapped
+            return None
+        page_shape = tiff.pages[0].shape
+        if not pages.dtype.isnative or pages.size != self.total_frames * int(np.prod(page_shape)):
+            return None
+        return pages.reshape((self.total_frames,) + tuple(page_shape))
+    
+    def _frame_published(self, frame_index: int):
+        # Notify the GUI thread that a frame was added to the ring buffer
+        self.frame_ready.emit(frame_index)
+        if self._first_frame_pending:
+            self._first_frame_pending = False
+            self.first_frame_ready.emit(frame_index)
+    
+    def _frames_to_skip(self) -> int:
+        """Frames the display is behind by while playing, capped by MAX_FRAME_SKIP"""
+        rate, last_display_ts = self.display_rate, self.last_display_ts
+        if rate is None or last_display_ts is None:
+            return 0
+        # A display that stalls, or keeps presenting slower than the playback
+        # rate, shows every n-th frame instead of falling further behind
+        elapsed = max(time.monotonic() - last_display_ts, self.display_interval or 0.0)
+        behind = int(elapsed * rate) - 1
+        # Never skip past the end of the file; the loop wraps around there
+        return max(0, min(behind, self.MAX_FRAME_SKIP,
+                          self.total_frames - 1 - self.current_frame_index))
+    
+    def _apply_sync_target(self):
+        # Turn the sync master's frame into a seek only when it is not buffered yet
+        target = self.sync_target
+        if target is not None:
+            self.sync_target = None
+            if not self._is_buffered(target):
+                self.seek_request = target
+    
+    def _is_buffered(self, frame_index: int) -> bool:
+        """Whether frame_index is in the ring buffer or is the next frame to load"""
+        if self.total_frames <= 0:
+            return False
+        oldest = self.ring.peek_index()
+        if oldest < 0:
+            oldest = self.current_frame_index
+        # Buffered frames are consecutive, wrapping at the end of the file
+        return ((frame_index - oldest) % self.total_frames
+                <= (self.current_frame_index - oldest) % self.total_frames)
+    
+    def _should_yield(self) -> bool:
+        # Stop waiting for buffer space when stopping or seeking
+        return self.stopped or self.seek_request is not None
+    
+    def mark_displayed(self):
+        """Record that the GUI has just displayed a frame (consumer side)"""
+        now = time.monotonic()
+        if self.last_display_ts is not None:
+            self.display_interval = now - self.last_display_ts
+        self.last_display_ts = now
+    
+    def reset_display_clock(self):
+        # Forget the display timing, so no frames are skipped until the next display
+        self.last_display_ts = None
+        self.display_interval = None
+    
+    def seek(self, frame_index: int) -> int:
+        """Continue loading from frame_index without restarting the thread (consumer side).
+        Returns the frame index actually requested, clamped to the file's frames."""
+        if self.total_frames > 0:
+            frame_index = max(0, min(frame_index, self.total_frames - 1))
+        self.reset_display_clock()
+        self.seek_request = frame_index
+        self.ring.clear()
+        return frame_index
+    
+    def sync_to(self, frame_index: int):
+        """Catch up with a sync master's frame, seeking only if it is not buffered"""
+        self.reset_display_clock()
+        self.sync_target = frame_index
     
     def get_frame(self) -> Tuple[Optional[np.ndarray], int]:
-        if not self.frame_queue.empty():
-            return self.frame_queue.get()
-        return None, -1
+        return self.ring.pop()
     
     def stop(self):
         self.stopped = True
+        self.ring.wake()
         self.wait()
 
+# Application-wide style, installed once by the first window instead of being
+# parsed again for every window. Player-only rules are scoped to VideoPlayerWindow.
+APP_STYLE_SHEET = """
+QMainWindow, QWidget {
+    background-color: #2D2D30;
+    color: #E0E0E0;
+}
+QLabel {
+    color: #E0E0E0;
+    font-size: 14px;
+}
+QPushButton {
+    background-color: #007ACC;
+    color: white;
+    border: none;
+    padding: 8px 16px;
+    border-radius: 4px;
+    font-weight: bold;
+}
+QPushButton:hover {
+    background-color: #1C97EA;
+}
+QPushButton:pressed {
+    background-color: #0062A3;
+}
+QPushButton:disabled {
+    background-color: #555555;
+    color: #888888;
+}
+QCheckBox {
+    color: #E0E0E0;
+    font-size: 14px;
+}
+QCheckBox::indicator {
+    width: 18px;
+    height: 18px;
+}
+QCheckBox::indicator:checked {
+    background-color: #007ACC;
+    border: 2px solid #E0E0E0;
+    border-radius: 3px;
+}
+QMenuBar {
+    background-color: #2D2D30;
+    color: #E0E0E0;
+}
+QMenuBar::item {
+    background-color: transparent;
+    padding: 4px 10px;
+}
+QMenuBar::item:selected {
+    background-color: #3E3E40;
+}
+QMenu {
+    background-color: #2D2D30;
+    color: #E0E0E0;
+    border: 1px solid #3E3E40;
+}
+QMenu::item:selected {
+    background-color: #3E3E40;
+}
+VideoPlayerWindow QSlider::groove:horizontal {
+    border: 1px solid #999999;
+    height: 8px;
+    background: #3D3D3D;
+    margin: 2px 0;
+    border-radius: 4px;
+}
+VideoPlayerWindow QSlider::handle:horizontal {
+    background: #007ACC;
+    border: 1px solid #5c5c5c;
+    width: 18px;
+    margin: -8px 0;
+    border-radius: 9px;
+}
+VideoPlayerWindow QSlider::handle:horizontal:hover {
+    background: #1C97EA;
+}
+VideoPlayerWindow QSpinBox {
+    background-color: #3D3D3D;
+    color: #E0E0E0;
+    border: 1px solid #555555;
+    padding: 4px;
+    border-radius: 4px;
+}
+QGroupBox {
+    border: 1px solid #555555;
+    border-radius: 5px;
+    margin-top: 1ex;
+    padding-top: 10px;
+}
+VideoPlayerWindow QGroupBox::title {
+    subcontrol-origin: margin;
+    subcontrol-position: top center;
+    padding: 0 3px;
+    color: #E0E0E0;
+}
+"""
+
+def install_app_style_sheet():
+    """Apply APP_STYLE_SHEET to the application unless it is already installed"""
+    app = QApplication.instance()
+    if not app.styleSheet():
+        app.setStyleSheet(APP_STYLE_SHEET)
+
 class VideoPlayerWindow(QMainWindow):
     frame_updated = pyqtSignal()
     
@@ -144,15 +525,43 @@ class VideoPlayerWindow(QMainWindow):
         self.playback_speed = 1.0
         self.is_playing = False
         self.loader_thread = None
-        self.last_update_time = time.time()
-        self.frame_update_pending = False
+        
+        # Set while an overlay uses this player as its main player; frames are
+        # then displayed blended by the OverlayManager only
+        self.overlay_active = False
+        
+        # Per-frame conversion to displayable uint8 and its QImage format,
+        # chosen once from the first frame of the file
+        self._frame_converter = None
+        self._frame_q_format: Optional[QImage.Format] = None
+        self._u8buf: Optional[np.ndarray] = None
+        
+        # Frame index a seek is waiting for; frames loaded before the seek are skipped
+        self._seek_target: Optional[int] = None
+        
+        # Label-sized buffer frames are downscaled into, with its QImage wrapper
+        # (owned by the specialized display function, see _make_display_frame)
+        self._scaled_buf: Optional[np.ndarray] = None
+        self._scaled_qimage: Optional[QImage] = None
         
         # Initialize UI
         self.init_ui()
         
-        # Set up the timer for playback
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.update_frame)
+        # Playback is driven by the loader's frame_ready signal; presentations
+        # are spaced by the frame interval with a single-shot timer
+        self._pace = QElapsedTimer()
+        self._frame_interval_ms = 1000 / self.fps
+        self._present_timer = QTimer(self)
+        self._present_timer.setSingleShot(True)
+        self._present_timer.setTimerType(Qt.PreciseTimer)
+        self._present_timer.timeout.connect(self._present_frame)
+        
+        # Collapse rapid slider moves into a single seek to the last value
+        self._pending_seek = 0
+        self._seek_timer = QTimer(self)
+        self._seek_timer.setSingleShot(True)
+        self._seek_timer.setInterval(30)
+        self._seek_timer.timeout.connect(self._do_seek)
         
         # Load video if path is provided
         if file_path:
@@ -164,69 +573,7 @@ class VideoPlayerWindow(QMainWindow):
         self.setMinimumSize(800, 600)
         # Center the window on the screen
         self.center_on_screen()
-        self.setStyleSheet("""
-            QMainWindow, QWidget {
-                background-color: #2D2D30;
-                color: #E0E0E0;
-            }
-            QLabel {
-                color: #E0E0E0;
-            }
-            QPushButton {
-                background-color: #007ACC;
-                color: white;
-                border: none;
-                padding: 8px 16px;
-                border-radius: 4px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #1C97EA;
-            }
-            QPushButton:pressed {
-                background-color: #0062A3;
-            }
-            QPushButton:disabled {
-                background-color: #555555;
-                color: #888888;
-            }
-            QSlider::groove:horizontal {
-                border: 1px solid #999999;
-                height: 8px;
-                background: #3D3D3D;
-                margin: 2px 0;
-                border-radius: 4px;
-            }
-            QSlider::handle:horizontal {
-                background: #007ACC;
-                border: 1px solid #5c5c5c;
-                width: 18px;
-                margin: -8px 0;
-                border-radius: 9px;
-            }
-            QSlider::handle:horizontal:hover {
-                background: #1C97EA;
-            }
-            QSpinBox {
-                background-color: #3D3D3D;
-                color: #E0E0E0;
-                border: 1px solid #555555;
-                padding: 4px;
-                border-radius: 4px;
-            }
-            QGroupBox {
-                border: 1px solid #555555;
-                border-radius: 5px;
-                margin-top: 1ex;
-                padding-top: 10px;
-            }
-            QGroupBox::title {
-                subcontrol-origin: margin;
-                subcontrol-position: top center;
-                padding: 0 3px;
-                color: #E0E0E0;
-            }
-        """)
+        install_app_style_sheet()
         
         # Create central widget and layout
         central_widget = QWidget()
@@ -357,9 +704,13 @@ class VideoPlayerWindow(QMainWindow):
         # Update window title
         self.setWindowTitle(f"Video Player - {os.path.basename(file_path)}")
         self.file_path = file_path
+        self._frame_converter = None
+        self._reset_display()
         
         # Initialize and start the loader thread
         self.loader_thread = VideoLoaderThread(file_path)
+        self.loader_thread.frame_ready.connect(self._on_frame_ready, Qt.QueuedConnection)
+        self.loader_thread.first_frame_ready.connect(self._update_after_seek, Qt.QueuedConnection)
         self.loader_thread.loading_finished.connect(self._on_loading_finished_preserve_position)
         self.loader_thread.error_occurred.connect(self.on_error)
         self.loader_thread.start()
@@ -385,25 +736,33 @@ class VideoPlayerWindow(QMainWindow):
     def on_error(self, error_message: str):
         QMessageBox.critical(self, "Error", error_message)
     
+    def _on_frame_ready(self, frame_index: int):
+        # A frame arrived; present it once the current frame interval has passed
+        if self.is_playing and not self._present_timer.isActive():
+            remaining = self._frame_interval_ms - self._pace.elapsed()
+            self._present_timer.start(max(0, round(remaining)))
+    
+    def _present_frame(self):
+        self._pace.restart()
+        self.update_frame()
+        
+        # Keep presenting buffered frames; on underflow wait for frame_ready
+        if self.is_playing and self.loader_thread and not self.loader_thread.ring.is_empty():
+            self._on_frame_ready(self.current_frame_index)
+    
     def update_frame(self):
         if not self.loader_thread:
             return
             
-        # Limit frame updates to improve performance
-        current_time = time.time()
-        if current_time - self.last_update_time < 0.01 and self.frame_update_pending:
-            return
-            
-        self.frame_update_pending = True
-        self.last_update_time = current_time
-            
-        frame, frame_index = self.loader_thread.get_frame()
+        frame, frame_index = self._get_frame()
         if frame is not None:
             self.current_frame = frame
             self.current_frame_index = frame_index
             
             # Update the display
-            self.display_frame(frame)
+            if not self.overlay_active:
+                self.display_frame(frame)
+            self.loader_thread.mark_displayed()
             
             # Update slider and label without triggering events
             self.frame_slider.blockSignals(True)
@@ -421,47 +780,102 @@ class VideoPlayerWindow(QMainWindow):
             # Sync with other players if in a sync group
             if self.sync_group and self.sync_group.is_master(self):
                 self.sync_group.sync_to_frame(frame_index)
-        
-        self.frame_update_pending = False
     
     def display_frame(self, frame: np.ndarray):
-        # Optimize frame processing
+        """Display a frame, binding a display function specialized for its format"""
         try:
-            # Convert directly without normalization for better performance
-            # Only normalize if needed (e.g., for specific image types)
-            if frame.dtype != np.uint8:
-                if frame.max() != frame.min():  # Avoid division by zero
-                    normalized_frame = (frame - frame.min()) / (frame.max() - frame.min()) * 255
-                    frame = normalized_frame.astype(np.uint8)
-                else:
-                    frame = np.zeros_like(frame, dtype=np.uint8)
-            
-            # Ensure the frame is in the correct format (RGB)
-            if len(frame.shape) == 2:  # Grayscale
-                frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2RGB)
-            elif frame.shape[2] == 1:  # Single channel
-                frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2RGB)
-            elif frame.shape[2] == 4:  # RGBA
-                frame = cv2.cvtColor(frame, cv2.COLOR_RGBA2RGB)
-            
-            h, w, ch = frame.shape
-            bytes_per_line = ch * w
-            
-            # Convert the frame to QImage
-            q_img = QImage(frame.data, w, h, bytes_per_line, QImage.Format_RGB888)
-            
-            # Scale the image to fit the label while maintaining aspect ratio
-            pixmap = QPixmap.fromImage(q_img)
-            
-            # Use FastTransformation for better performance
-            scaled_pixmap = pixmap.scaled(self.video_label.size(), 
-                                         Qt.KeepAspectRatio, 
-                                         Qt.FastTransformation)
-            
-            # Display the image
-            self.video_label.setPixmap(scaled_pixmap)
+            # The frame format is fixed for the whole file, so classify it once
+            if self._frame_converter is None:
+                self._classify_frame(frame)
+            self.display_frame = self._make_display_frame(frame.shape)
         except Exception as e:
             print(f"Error displaying frame: {e}")
+            return
+        self.display_frame(frame)
+    
+    def _make_display_frame(self, shape):
+        """Build the per-frame display function for frames of the given shape"""
+        converter = self._frame_converter
+        q_format = self._frame_q_format
+        set_pixmap = self.video_label.setPixmap
+        
+        # Fit the frame into the label while maintaining aspect ratio
+        h, w = shape[:2]
+        target_size = QSize(w, h).scaled(self.video_label.size(), Qt.KeepAspectRatio)
+        tw, th = target_size.width(), target_size.height()
+        if tw <= 0 or th <= 0:
+            return lambda frame: None
+        
+        # Preallocated label-sized buffer, wrapped once; it is rewritten in place
+        # every frame. Padded rows are not a contiguous buffer, so pass the address
+        if q_format == QImage.Format_Grayscale8:
+            scaled_buf = aligned_frame_buffer((th, tw))
+        else:
+            scaled_buf = aligned_frame_buffer((th, tw, shape[2]))
+        scaled_qimage = QImage(sip.voidptr(scaled_buf.ctypes.data), tw, th,
+                               scaled_buf.strides[0], q_format)
+        self._scaled_buf, self._scaled_qimage = scaled_buf, scaled_qimage
+        
+        def display(frame: np.ndarray):
+            # Frames of another shape need a new display function
+            if frame.shape != shape:
+                self._reset_display()
+                self.display_frame(frame)
+                return
+            try:
+                # Downscale with OpenCV and display the image at exact label size
+                cv2.resize(converter(frame), (tw, th), dst=scaled_buf, interpolation=cv2.INTER_AREA)
+                set_pixmap(QPixmap.fromImage(scaled_qimage))
+            except Exception as e:
+                print(f"Error displaying frame: {e}")
+        
+        return display
+    
+    def _reset_display(self):
+        # Drop the specialized display function; the next frame builds a new one
+        self.__dict__.pop('display_frame', None)
+    
+    def _classify_frame(self, frame: np.ndarray):
+        """Choose the conversion and QImage format used for every frame of this file"""
+        needs_normalize = frame.dtype != np.uint8
+        
+        if needs_normalize:
+            converter = self._normalize_to_u8
+        else:
+            # Already displayable in its native channel order
+            converter = lambda f: f
+        
+        self._frame_converter = converter
+        self._frame_q_format = self.frame_format(converter(frame))
+    
+    def _u8_buffer(self, shape) -> np.ndarray:
+        """Reused uint8 output buffer for normalized frames"""
+        if self._u8buf is None or self._u8buf.shape != shape:
+            self._u8buf = np.empty(shape, dtype=np.uint8)
+        return self._u8buf
+    
+    def _normalize_to_u8(self, frame: np.ndarray) -> np.ndarray:
+        """Stretch the frame's value range to 0-255 into a reused uint8 buffer"""
+        # One min/max reduction over a 2-D view (OpenCV reduces single-channel
+        # arrays only), then one scale-and-offset pass straight to uint8
+        fmin, fmax, _, _ = cv2.minMaxLoc(frame.reshape(frame.shape[0], -1))
+        dst = self._u8_buffer(frame.shape)
+        if fmax <= fmin:  # Avoid division by zero
+            dst.fill(0)
+            return dst
+        alpha = 255.0 / (fmax - fmin)
+        return cv2.convertScaleAbs(frame, dst, alpha, -fmin * alpha)
+    
+    def frame_format(self, frame: np.ndarray) -> QImage.Format:
+        """QImage format matching the channel layout of a frame from this player"""
+        if frame.ndim == 2 or frame.shape[2] == 1:
+            # Gray frames are shown as they are, not expanded to RGB
+            return QImage.Format_Grayscale8
+        if frame.shape[2] == 4:
+            return QImage.Format_RGBA8888
+        if self.loader_thread:
+            return self.loader_thread.qimage_format
+        return QImage.Format_RGB888
     
     def toggle_playback(self):
         if self.is_playing:
@@ -477,9 +891,12 @@ class VideoPlayerWindow(QMainWindow):
         self.play_button.setText("⏸")
         self.play_button.setToolTip("Pause")
         
-        # Calculate timer interval based on FPS and playback speed
-        interval = int(1000 / (self.fps * self.playback_speed))
-        self.timer.start(interval)
+        # Calculate the frame interval based on FPS and playback speed
+        self._frame_interval_ms = 1000 / (self.fps * self.playback_speed)
+        self.loader_thread.display_rate = self.fps * self.playback_speed
+        self.loader_thread.reset_display_clock()
+        self._pace.start()
+        self._present_timer.start(0)
         
         # Notify sync group if master
         if self.sync_group and self.sync_group.is_master(self):
@@ -489,7 +906,9 @@ class VideoPlayerWindow(QMainWindow):
         self.is_playing = False
         self.play_button.setText("▶")
         self.play_button.setToolTip("Play")
-        self.timer.stop()
+        self._present_timer.stop()
+        if self.loader_thread:
+            self.loader_thread.display_rate = None
         
         # Notify sync group if master
         if self.sync_group and self.sync_group.is_master(self):
@@ -542,10 +961,19 @@ class VideoPlayerWindow(QMainWindow):
             return
             
         # Get the frame index from the slider
-        frame_index = self.frame_slider.value()
+        self._pending_seek = self.frame_slider.value()
         
         # Update current frame display
-        self.current_frame_display.setText(str(frame_index))
+        self.current_frame_display.setText(str(self._pending_seek))
+        
+        # Seek once the slider has settled
+        self._seek_timer.start()
+    
+    def _do_seek(self):
+        if not self.loader_thread:
+            return
+            
+        frame_index = self._pending_seek
         
         # Only seek if the frame index has actually changed
         if frame_index != self.current_frame_index:
@@ -562,46 +990,45 @@ class VideoPlayerWindow(QMainWindow):
                 self.start_playback()
     
     def _seek_to_frame(self, frame_index):
-        # Stop current loader thread
-        if self.loader_thread:
-            self.loader_thread.stop()
-            
-        # Create a new loader thread starting at the requested frame
-        self.loader_thread = VideoLoaderThread(self.file_path, start_frame=frame_index)
-        
-        # Connect signals but don't call on_loading_finished directly
-        # Instead, use a custom slot that preserves the frame position
-        self.loader_thread.loading_finished.connect(self._on_loading_finished_preserve_position)
-        self.loader_thread.error_occurred.connect(self.on_error)
-        self.loader_thread.start()
+        # Reposition the running loader instead of recreating it
+        frame_index = self.loader_thread.seek(frame_index)
+        self._seek_target = frame_index
         
         # Update frame label and current frame index
         self.frame_label.setText(f"Frame: {frame_index} / {self.total_frames - 1}")
         self.current_frame_index = frame_index
         
-        # Immediately get and display the first frame after seeking
-        # This ensures the display updates immediately without needing to click play
-        QTimer.singleShot(100, self._update_after_seek)
+        # The loader's first_frame_ready signal displays the frame once it is
+        # loaded, so the display updates without needing to click play
     
-    def _update_after_seek(self):
-        """Update the display with the current frame after seeking"""
+    def _update_after_seek(self, frame_index: int):
+        """Display the first frame loaded after seeking while paused"""
         if not self.loader_thread:
             return
-            
-        # Try to get the frame a few times, as it might take a moment to load
-        for _ in range(5):
+        
+        # The loader started somewhere other than the seek target (e.g. it wrapped
+        # at the end of the file), so stop skipping frames while waiting for it
+        if (self._seek_target is not None and frame_index != self._seek_target
+                and self.loader_thread.seek_request is None):
+            self._seek_target = None
+        
+        # During playback the frame is presented through frame_ready
+        if self.is_playing:
+            return
+        
+        # Present it like any other frame, so an active overlay blends it and
+        # the slider and labels follow
+        self.update_frame()
+    
+    def _get_frame(self) -> Tuple[Optional[np.ndarray], int]:
+        """Next frame from the loader, skipping frames loaded before a pending seek"""
+        while True:
             frame, frame_index = self.loader_thread.get_frame()
-            if frame is not None:
-                self.current_frame = frame
-                self.current_frame_index = frame_index
-                
-                # Update the display
-                self.display_frame(frame)
-                return
-            
-            # Wait a bit for the frame to load
-            QApplication.processEvents()
-            time.sleep(0.05)
+            if frame is None or self._seek_target is None:
+                return frame, frame_index
+            if frame_index == self._seek_target:
+                self._seek_target = None
+                return frame, frame_index
     
     def _on_loading_finished_preserve_position(self, total_frames: int, fps: int):
         """Custom version of on_loading_finished that preserves the current frame position"""
@@ -620,10 +1047,10 @@ class VideoPlayerWindow(QMainWindow):
         new_fps = self.fps_spinbox.value()
         self.fps = new_fps
         
-        # Update timer interval if playing
+        # Update the frame interval if playing
         if self.is_playing:
-            interval = int(1000 / (self.fps * self.playback_speed))
-            self.timer.start(interval)
+            self._frame_interval_ms = 1000 / (self.fps * self.playback_speed)
+            self.loader_thread.display_rate = self.fps * self.playback_speed
             
         # Notify sync group if master
         if self.sync_group and self.sync_group.is_master(self):
@@ -631,20 +1058,22 @@ class VideoPlayerWindow(QMainWindow):
     
     def set_sync_frame(self, frame_index: int):
         """Set the frame index from a sync group master"""
-        if not self.loader_thread or frame_index == self.current_frame_index:
+        if not self.loader_thread or self.total_frames <= 0:
+            return
+        # The master may be longer than this player; loop within our own frames
+        frame_index %= self.total_frames
+        if frame_index == self.current_frame_index:
             return
             
-        # Pause playback temporarily
-        was_playing = self.is_playing
-        if was_playing:
-            self.stop_playback()
-        
-        # Seek to the requested frame
-        self._seek_to_frame(frame_index)
+        # A paused player shows the requested frame right away
+        if not self.is_playing:
+            self._seek_to_frame(frame_index)
+            return
         
-        # Resume playback if it was playing and the master is playing
-        if was_playing and self.sync_group and self.sync_group.master and self.sync_group.master.is_playing:
-            self.start_playback()
+        # While playing, skip ahead to the master's frame at our own pace;
+        # the loader only seeks when that frame is not already buffered
+        self._seek_target = frame_index
+        self.loader_thread.sync_to(frame_index)
     
     def set_sync_playing(self, is_playing: bool):
         # Called by sync group to synchronize playback state
@@ -657,6 +1086,11 @@ class VideoPlayerWindow(QMainWindow):
         # Called by sync group to synchronize FPS
         self.fps_spinbox.setValue(fps)
     
+    def resizeEvent(self, event):
+        # The label size changed, so refit the display size on the next frame
+        super().resizeEvent(event)
+        self._reset_display()
+    
     def closeEvent(self, event):
         # Clean up resources
         if self.loader_thread:
@@ -709,15 +1143,121 @@ class SyncGroup:
             if player != self.master:
                 player.set_sync_fps(fps)
 
+# OpenCV depths of the sample types frames can be decoded to
+CV_DEPTHS = {
+    np.dtype(np.uint8): cv2.CV_8U,
+    np.dtype(np.int8): cv2.CV_8S,
+    np.dtype(np.uint16): cv2.CV_16U,
+    np.dtype(np.int16): cv2.CV_16S,
+    np.dtype(np.int32): cv2.CV_32S,
+    np.dtype(np.float32): cv2.CV_32F,
+    np.dtype(np.float64): cv2.CV_64F,
+}
+
+def full_scale(dtype) -> float:
+    """Largest sample value of a frame type: the integer maximum, or 1.0 for floats"""
+    if np.issubdtype(dtype, np.integer):
+        return float(np.iinfo(dtype).max)
+    return 1.0
+
+# cv2.cvtColor codes converting between the channel layouts frames are kept in
+LAYOUT_CONVERSIONS = {
+    (QImage.Format_RGB888, QImage.Format_BGR888): cv2.COLOR_RGB2BGR,
+    (QImage.Format_BGR888, QImage.Format_RGB888): cv2.COLOR_BGR2RGB,
+    (QImage.Format_RGBA8888, QImage.Format_BGR888): cv2.COLOR_RGBA2BGR,
+    (QImage.Format_RGBA8888, QImage.Format_RGB888): cv2.COLOR_RGBA2RGB,
+    (QImage.Format_BGR888, QImage.Format_RGBA8888): cv2.COLOR_BGR2RGBA,
+    (QImage.Format_RGB888, QImage.Format_RGBA8888): cv2.COLOR_RGB2RGBA,
+    (QImage.Format_Grayscale8, QImage.Format_BGR888): cv2.COLOR_GRAY2BGR,
+    (QImage.Format_Grayscale8, QImage.Format_RGB888): cv2.COLOR_GRAY2RGB,
+    (QImage.Format_Grayscale8, QImage.Format_RGBA8888): cv2.COLOR_GRAY2RGBA,
+    (QImage.Format_BGR888, QImage.Format_Grayscale8): cv2.COLOR_BGR2GRAY,
+    (QImage.Format_RGB888, QImage.Format_Grayscale8): cv2.COLOR_RGB2GRAY,
+    (QImage.Format_RGBA8888, QImage.Format_Grayscale8): cv2.COLOR_RGBA2GRAY,
+}
+
+class BlendWorker(QObject):
+    """Blends overlay frames on its own thread and hands the result back to the UI"""
+    requested = pyqtSignal(object, object, str, float)
+    blended = pyqtSignal(object)
+    
+    def __init__(self, overlay_manager: 'OverlayManager'):
+        super().__init__()
+        self.overlay_manager = overlay_manager
+        self.requested.connect(self.blend, Qt.QueuedConnection)
+    
+    @pyqtSlot(object, object, str, float)
+    def blend(self, main_frame: np.ndarray, overlay_frame: np.ndarray, blend_mode: str, opacity: float):
+        try:
+            blended_frame = self.overlay_manager.blend_frames(main_frame, overlay_frame,
+                                                              blend_mode, opacity)
+        except Exception as e:
+            print(f"Error blending frames: {e}")
+            blended_frame = None
+        self.blended.emit(blended_frame)
+    
+    @pyqtSlot()
+    def warm_up(self):
+        self.overlay_manager.warm_up_kernels()
+
 class OverlayManager:
+    # Rows blended per strip on the CPU path (64 rows of a 1080p frame fit in L2)
+    BLEND_TILE_ROWS = 64
+    # Blend areas larger than this (full HD) are sent to the OpenCL device. The
+    # cut-off is an unmeasured estimate: the CPU kernels take a few milliseconds
+    # at full HD, and device transfers were not timed against an actual GPU
+    OPENCL_MIN_PIXELS = 1920 * 1080
+    
     def __init__(self):
         self.main_player: Optional[VideoPlayerWindow] = None
         self.overlay_player: Optional[VideoPlayerWindow] = None
         self.blend_mode: str = "Normal"  # Normal, Add, Multiply, Screen, Difference
         self.opacity: float = 0.5  # 0.0 to 1.0
         self.is_active: bool = False
+        
+        # Full-scale value of the frames being blended (255 for uint8, 65535 for uint16)
+        self._full_scale: float = 255.0
+        
+        # Blending runs on a worker thread, started on first activation
+        self._blend_thread: Optional[QThread] = None
+        self._blend_worker: Optional[BlendWorker] = None
+        # The UI hands over one frame pair at a time; newer frames arriving while
+        # the worker is busy are blended once it is done
+        self._blend_pending: bool = False
+        self._frames_waiting: bool = False
+        
+        # Copies of the frames being blended (the players reuse their frame
+        # buffers), owned by the UI thread until the worker reports back
+        self._main_in: Optional[np.ndarray] = None
+        self._overlay_in: Optional[np.ndarray] = None
+        # Overlay converted to the main frame's sample type, when the two differ
+        self._overlay_cast: Optional[np.ndarray] = None
+        
+        # Blend output, reused across frames and handed straight to display_frame.
+        # It is displayed before the next frame pair is sent, so one buffer suffices.
+        self._out: Optional[np.ndarray] = None
+        # Kernel temporary, reused across frames
+        self._tmp: Optional[np.ndarray] = None
+        # Strip views for the last blended buffers, see _blend_strips
+        self._strips: Optional[tuple] = None
+        
+        # Run the OpenCV kernels on the GPU through OpenCL (T-API) when a device is available
+        self.use_opencl: bool = cv2.ocl.haveOpenCL() and cv2.ocl.useOpenCL()
+        
+        # Per-mode kernels, each blending the overlay over src into dst (may alias src).
+        # They are built only from OpenCV calls, so they also accept cv2.UMat frames.
+        self._blend_kernels = {
+            "Normal": self._blend_normal,
+            "Add": self._blend_add,
+            "Multiply": self._blend_multiply,
+            "Screen": self._blend_screen,
+            "Difference": self._blend_difference,
+        }
     
     def set_main_player(self, player: 'VideoPlayerWindow'):
+        # Release the previous main player before switching
+        if self.main_player is not player:
+            self.deactivate()
         self.main_player = player
     
     def set_overlay_player(self, player: 'VideoPlayerWindow'):
@@ -730,14 +1270,19 @@ class OverlayManager:
         self.opacity = max(0.0, min(1.0, opacity))
     
     def activate(self):
+        if self.is_active:
+            return
         self.is_active = True
         if self.main_player and self.overlay_player:
+            self._start_blend_thread()
             # Connect signals for frame updates
+            self.main_player.overlay_active = True
             self.main_player.frame_updated.connect(self.update_overlay)
     
     def deactivate(self):
         self.is_active = False
         if self.main_player:
+            self.main_player.overlay_active = False
             # Disconnect signals
             try:
                 self.main_player.frame_updated.disconnect(self.update_overlay)
@@ -745,70 +1290,209 @@ class OverlayManager:
                 # Signal was not connected
                 pass
     
+    def shutdown(self):
+        """Deactivate and stop the blend thread"""
+        self.deactivate()
+        if self._blend_thread:
+            self._blend_thread.quit()
+            self._blend_thread.wait()
+            self._blend_thread = None
+            self._blend_worker = None
+            self._blend_pending = False
+    
+    def _start_blend_thread(self):
+        if self._blend_thread:
+            return
+        self._blend_thread = QThread()
+        self._blend_worker = BlendWorker(self)
+        self._blend_worker.moveToThread(self._blend_thread)
+        self._blend_worker.blended.connect(self._show_blended, Qt.QueuedConnection)
+        # Warm up on the blend thread as soon as it runs, before any frame is queued
+        self._blend_thread.started.connect(self._blend_worker.warm_up)
+        self._blend_thread.start()
+    
     def update_overlay(self):
         if not self.is_active or not self.main_player or not self.overlay_player:
             return
         
-        if self.main_player.current_frame is not None and self.overlay_player.current_frame is not None:
-            # Blend frames
-            blended_frame = self.blend_frames(
-                self.main_player.current_frame,
-                self.overlay_player.current_frame,
-                self.blend_mode,
-                self.opacity
-            )
-            
-            # Display the blended frame
-            self.main_player.display_frame(blended_frame)
+        main_frame = self.main_player.current_frame
+        overlay_frame = self.overlay_player.current_frame
+        if main_frame is None:
+            return
+        if overlay_frame is None or not self._blend_worker:
+            # Nothing to blend yet
+            self.main_player.display_frame(main_frame)
+            return
+        if self._blend_pending:
+            # Blend the newest frames once the worker is done with the current pair
+            self._frames_waiting = True
+            return
+        
+        # Frames are kept in their decoded channel order, so bring the overlay
+        # into the main player's layout when the two sources differ. Converting
+        # and copying are one pass; OpenCV reallocates the buffers on a format change.
+        conversion = LAYOUT_CONVERSIONS.get((self.overlay_player.frame_format(overlay_frame),
+                                             self.main_player.frame_format(main_frame)))
+        overlay_in = overlay_frame
+        if conversion is not None:
+            overlay_in = self._overlay_in = cv2.cvtColor(overlay_frame, conversion,
+                                                         dst=self._overlay_in)
+        
+        # Likewise bring the overlay to the main frame's sample type (e.g. a 16-bit
+        # TIFF over an 8-bit video), scaled between the two full-scale values
+        depth = CV_DEPTHS.get(main_frame.dtype)
+        if overlay_in.dtype != main_frame.dtype and depth is not None:
+            scale = full_scale(main_frame.dtype) / full_scale(overlay_in.dtype)
+            overlay_in = self._overlay_cast = cv2.addWeighted(
+                overlay_in, scale, overlay_in, 0, 0, dst=self._overlay_cast, dtype=depth)
+        elif overlay_in is overlay_frame:
+            overlay_in = self._overlay_in = cv2.copyTo(overlay_frame, None, dst=self._overlay_in)
+        self._main_in = cv2.copyTo(main_frame, None, dst=self._main_in)
+        
+        # Blend on the worker thread; the result comes back through _show_blended
+        self._blend_pending = True
+        self._blend_worker.requested.emit(self._main_in, overlay_in,
+                                          self.blend_mode, self.opacity)
+    
+    def _show_blended(self, blended_frame: Optional[np.ndarray]):
+        self._blend_pending = False
+        if self.is_active and self.main_player:
+            # Display the blended frame, or the main frame alone if blending failed
+            self.main_player.display_frame(blended_frame if blended_frame is not None
+                                           else self._main_in)
+        if self._frames_waiting:
+            self._frames_waiting = False
+            self.update_overlay()
     
     def blend_frames(self, main_frame: np.ndarray, overlay_frame: np.ndarray, 
                      blend_mode: str, opacity: float) -> np.ndarray:
-        # Create a copy of the main frame to avoid modifying the original
-        result = main_frame.copy()
-        
-        # Get dimensions
-        main_h, main_w = main_frame.shape[:2]
-        overlay_h, overlay_w = overlay_frame.shape[:2]
+        # Nothing of the overlay shows at zero opacity
+        if opacity <= 0.0:
+            return main_frame
+        
+        # Blend into the persistent output buffer, never into the main frame itself
+        if self._out is None or self._out.shape != main_frame.shape or self._out.dtype != main_frame.dtype:
+            self._out = np.empty_like(main_frame)
+        result = self._out
+        self._full_scale = full_scale(main_frame.dtype)
+        
+        # Blend on the visible area, uint8 in and out (no float temporaries)
+        kernel = self._blend_kernels.get(blend_mode)
+        if not kernel:
+            np.copyto(result, main_frame)
+            return result
         
         # Calculate the visible area of the overlay frame
-        visible_h = min(main_h, overlay_h)
-        visible_w = min(main_w, overlay_w)
+        visible_h = min(main_frame.shape[0], overlay_frame.shape[0])
+        visible_w = min(main_frame.shape[1], overlay_frame.shape[1])
+        covers_frame = (visible_h, visible_w) == main_frame.shape[:2]
+        if not covers_frame:
+            # Keep the uncovered area and blend the visible part in place
+            np.copyto(result, main_frame)
+        
+        if self.use_opencl and visible_h * visible_w > self.OPENCL_MIN_PIXELS:
+            # Large frames: upload both frames, blend on the device and download
+            # the result. Smaller ones blend faster on the CPU than they transfer.
+            result_visible = result[:visible_h, :visible_w]
+            device_result = cv2.UMat(main_frame if covers_frame else result_visible)
+            kernel(device_result, cv2.UMat(overlay_frame[:visible_h, :visible_w]), opacity, device_result)
+            result_visible[...] = device_result.get()
+        else:
+            # Run the whole kernel strip by strip, so the passes of a multi-pass
+            # kernel reuse rows that are still in cache
+            for src, overlay, dst in self._blend_strips(main_frame, overlay_frame, result):
+                kernel(src, overlay, opacity, dst)
         
-        # Get the visible portion of the overlay frame
+        return result
+    
+    def warm_up_kernels(self):
+        """Run every blend kernel once on a small frame"""
+        # The first OpenCL call of each kernel builds its device program, which
+        # can take far longer than a frame; do it before playback needs it
+        frame = np.zeros((16, 16, 3), np.uint8)
+        out = np.empty_like(frame)
+        for kernel in self._blend_kernels.values():
+            try:
+                kernel(frame, frame, 0.5, out)
+                if self.use_opencl:
+                    device_frame = cv2.UMat(frame)
+                    kernel(device_frame, device_frame, 0.5, cv2.UMat(out))
+            except cv2.error as e:
+                print(f"Error warming up blend kernel: {e}")
+    
+    def _blend_strips(self, main_frame: np.ndarray, overlay_frame: np.ndarray,
+                      result: np.ndarray) -> List[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """(src, overlay, dst) row strips of the visible area, built once per set of buffers"""
+        # The blend thread hands over the same input and output buffers every
+        # frame, so the views are reused until one of them is reallocated
+        cached = self._strips
+        if (cached and cached[0] is main_frame and cached[1] is overlay_frame
+                and cached[2] is result):
+            return cached[3]
+        
+        visible_h = min(main_frame.shape[0], overlay_frame.shape[0])
+        visible_w = min(main_frame.shape[1], overlay_frame.shape[1])
         overlay_visible = overlay_frame[:visible_h, :visible_w]
+        result_visible = result[:visible_h, :visible_w]
+        if (visible_h, visible_w) == main_frame.shape[:2]:
+            # The overlay covers the whole frame: read the main frame directly,
+            # so copying and blending are a single pass
+            source = main_frame
+        else:
+            source = result_visible
         
-        # Apply blend mode to the visible area
-        if blend_mode == "Normal":
-            # Simple alpha blending
-            result[:visible_h, :visible_w] = (
-                (1 - opacity) * result[:visible_h, :visible_w] + 
-                opacity * overlay_visible
-            ).astype(np.uint8)
-        
-        elif blend_mode == "Add":
-            # Additive blending
-            added = result[:visible_h, :visible_w] + overlay_visible * opacity
-            result[:visible_h, :visible_w] = np.clip(added, 0, 255).astype(np.uint8)
-        
-        elif blend_mode == "Multiply":
-            # Multiply blending
-            multiplied = result[:visible_h, :visible_w] * (1 - opacity + opacity * overlay_visible / 255)
-            result[:visible_h, :visible_w] = np.clip(multiplied, 0, 255).astype(np.uint8)
-        
-        elif blend_mode == "Screen":
-            # Screen blending
-            inverted_main = 255 - result[:visible_h, :visible_w]
-            inverted_overlay = 255 - overlay_visible
-            screened = 255 - (inverted_main * (1 - opacity + opacity * inverted_overlay / 255))
-            result[:visible_h, :visible_w] = np.clip(screened, 0, 255).astype(np.uint8)
-        
-        elif blend_mode == "Difference":
-            # Difference blending
-            diff = np.abs(result[:visible_h, :visible_w] - overlay_visible)
-            result[:visible_h, :visible_w] = (result[:visible_h, :visible_w] * (1 - opacity) + 
-                                             diff * opacity).astype(np.uint8)
-        
-        return result
+        rows = self.BLEND_TILE_ROWS
+        strips = [(source[y:y + rows], overlay_visible[y:y + rows], result_visible[y:y + rows])
+                  for y in range(0, visible_h, rows)]
+        self._strips = (main_frame, overlay_frame, result, strips)
+        return strips
+    
+    def _blend_normal(self, src: np.ndarray, overlay: np.ndarray, opacity: float, dst: np.ndarray):
+        # Simple alpha blending
+        self._mix(src, overlay, opacity, dst)
+    
+    def _blend_add(self, src: np.ndarray, overlay: np.ndarray, opacity: float, dst: np.ndarray):
+        # Additive blending, saturating at 255
+        cv2.addWeighted(src, 1.0, overlay, opacity, 0, dst=dst)
+    
+    def _blend_multiply(self, src: np.ndarray, overlay: np.ndarray, opacity: float, dst: np.ndarray):
+        # Multiply blending: main * overlay / full_scale, mixed back over main by opacity
+        product = cv2.multiply(src, overlay, dst=self._scratch(src), scale=1 / self._full_scale)
+        self._mix(src, product, opacity, dst)
+    
+    def _blend_screen(self, src: np.ndarray, overlay: np.ndarray, opacity: float, dst: np.ndarray):
+        # Screen blending: main + opacity * overlay * (full_scale - main) / full_scale,
+        # which never exceeds full scale, so the saturating add is exact. The opacity
+        # is folded into the product, saving the separate mix pass.
+        # full_scale - main works for every sample type; the scalar is passed per
+        # channel, since older OpenCV applies a bare number to the first channel only
+        lift = cv2.subtract((self._full_scale,) * 4, src, dst=self._scratch(src))
+        cv2.multiply(lift, overlay, dst=lift, scale=opacity / self._full_scale)
+        cv2.add(src, lift, dst=dst)
+    
+    def _blend_difference(self, src: np.ndarray, overlay: np.ndarray, opacity: float, dst: np.ndarray):
+        # Difference blending: |main - overlay| mixed back over main by opacity
+        diff = cv2.absdiff(src, overlay, dst=self._scratch(src))
+        self._mix(src, diff, opacity, dst)
+    
+    def _mix(self, src: np.ndarray, blended: np.ndarray, opacity: float, dst: np.ndarray):
+        # Shared opacity step of the blend modes: src * (1 - opacity) + blended * opacity,
+        # rounded and saturated in a single OpenCV pass
+        if opacity >= 1.0:
+            # Fully opaque: the mode result replaces the main frame as is
+            cv2.copyTo(blended, None, dst=dst)
+        else:
+            cv2.addWeighted(src, 1 - opacity, blended, opacity, 0, dst=dst)
+    
+    def _scratch(self, like) -> Optional[np.ndarray]:
+        # Temporary for a kernel: reused on the host, left to OpenCV for device (UMat) frames
+        if isinstance(like, cv2.UMat):
+            return None
+        # Sized by the first (full) strip; the shorter last strip uses its top rows
+        if (self._tmp is None or self._tmp.shape[0] < like.shape[0]
+                or self._tmp.shape[1:] != like.shape[1:] or self._tmp.dtype != like.dtype):
+            self._tmp = np.empty_like(like)
+        return self._tmp[:like.shape[0]]
 
 class OverlayDialog(QDialog):
     def __init__(self, parent, players):
@@ -896,17 +1580,19 @@ class OverlayDialog(QDialog):
         player_group = QGroupBox("プレーヤー選択")
         player_layout = QVBoxLayout(player_group)
         
+        # Both lists show the same entries, so build the labels once
+        labels = [f"プレーヤー {i+1}: {os.path.basename(player.file_path)}"
+                  for i, player in enumerate(self.players)]
+        
         # Main player selection
         main_label = QLabel("メインプレーヤー:")
         self.main_list = QListWidget()
-        for i, player in enumerate(self.players):
-            self.main_list.addItem(f"プレーヤー {i+1}: {os.path.basename(player.file_path)}")
+        self.main_list.addItems(labels)
         
         # Overlay player selection
         overlay_label = QLabel("オーバーレイプレーヤー:")
         self.overlay_list = QListWidget()
-        for i, player in enumerate(self.players):
-            self.overlay_list.addItem(f"プレーヤー {i+1}: {os.path.basename(player.file_path)}")
+        self.overlay_list.addItems(labels)
         
         player_layout.addWidget(main_label)
         player_layout.addWidget(self.main_list)
@@ -1080,66 +1766,7 @@ class MainApplication(QMainWindow):
         self.setWindowFlags(self.windowFlags() | Qt.WindowStaysOnTopHint)
         # Position the window in the top-left corner of the screen
         self.move(0, 0)
-        self.setStyleSheet("""
-            QMainWindow, QWidget {
-                background-color: #2D2D30;
-                color: #E0E0E0;
-            }
-            QLabel {
-                color: #E0E0E0;
-                font-size: 14px;
-            }
-            QPushButton {
-                background-color: #007ACC;
-                color: white;
-                border: none;
-                padding: 8px 16px;
-                border-radius: 4px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #1C97EA;
-            }
-            QPushButton:pressed {
-                background-color: #0062A3;
-            }
-            QPushButton:disabled {
-                background-color: #555555;
-                color: #888888;
-            }
-            QCheckBox {
-                color: #E0E0E0;
-                font-size: 14px;
-            }
-            QCheckBox::indicator {
-                width: 18px;
-                height: 18px;
-            }
-            QCheckBox::indicator:checked {
-                background-color: #007ACC;
-                border: 2px solid #E0E0E0;
-                border-radius: 3px;
-            }
-            QMenuBar {
-                background-color: #2D2D30;
-                color: #E0E0E0;
-            }
-            QMenuBar::item {
-                background-color: transparent;
-                padding: 4px 10px;
-            }
-            QMenuBar::item:selected {
-                background-color: #3E3E40;
-            }
-            QMenu {
-                background-color: #2D2D30;
-                color: #E0E0E0;
-                border: 1px solid #3E3E40;
-            }
-            QMenu::item:selected {
-                background-color: #3E3E40;
-            }
-        """)
+        install_app_style_sheet()
         
         # Create menu bar
         menubar = self.menuBar()
@@ -1180,10 +1807,10 @@ class MainApplication(QMainWindow):
         
         # Sync checkbox in a simple layout
         sync_layout = QHBoxLayout()
-        sync_checkbox = QCheckBox("同期再生")
-        sync_checkbox.setToolTip("複数の動画を同時に再生します")
-        sync_checkbox.stateChanged.connect(self.toggle_sync)
-        sync_layout.addWidget(sync_checkbox)
+        self.sync_checkbox = QCheckBox("同期再生")
+        self.sync_checkbox.setToolTip("複数の動画を同時に再生します")
+        self.sync_checkbox.stateChanged.connect(self.toggle_sync)
+        sync_layout.addWidget(self.sync_checkbox)
         sync_layout.addStretch()
         
         # Add widgets to main layout
@@ -1218,11 +1845,7 @@ class MainApplication(QMainWindow):
             self.sync_group.add_player(player)
     
     def is_sync_enabled(self) -> bool:
-        # Find the sync checkbox
-        for child in self.centralWidget().children():
-            if isinstance(child, QCheckBox) and child.text() == "同期再生":
-                return child.isChecked()
-        return False
+        return self.sync_checkbox.isChecked()
     
     def toggle_sync(self, state: int):
         if state == Qt.Checked:
@@ -1249,7 +1872,8 @@ class MainApplication(QMainWindow):
             self.create_player(file_path)
     
     def closeEvent(self, event):
-        # Close all player windows
+        # Stop the overlay blend thread, then close all player windows
+        self.overlay_manager.shutdown()
         for player in self.players:
             player.close()
         event.accept()